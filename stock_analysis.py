@@ -1,8 +1,89 @@
+import asyncio
 import yfinance as yf
+import numpy as np
 import pandas as pd
-from datetime import datetime, timedelta
-from tabulate import tabulate
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 import sqlite3
+import time
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+DB_PATH = 'stock_analysis.db'
+
+# Maximum number of symbols Yahoo Finance accepts in a single download request
+BULK_CHUNK_SIZE = 20
+
+# Yahoo Finance chart endpoint used by the async downloader
+YAHOO_CHART_URL = 'https://query1.finance.yahoo.com/v8/finance/chart/{symbol}'
+
+# Maximum number of in-flight requests in download_bulk_async
+MAX_CONCURRENT_DOWNLOADS = 10
+
+# Number of trading days tracked after each purchase
+HOLD_DAYS = 7
+
+# Calendar days downloaded after a purchase, enough for HOLD_DAYS trading days around holidays
+HOLD_WINDOW_DAYS = 16
+
+# Insert statements shared by every ResultsWriter
+INSERT_RESULT_SQL = '''
+INSERT INTO stock_analysis 
+(symbol, purchase_date, purchase_price, analysis_date, closing_price, profit_percentage)
+VALUES (?, ?, ?, ?, ?, ?)
+'''
+
+INSERT_WIDE_SQL = '''
+INSERT OR REPLACE INTO profits_wide
+(symbol, purchase_date, purchase_price,
+ day1_pct, day2_pct, day3_pct, day4_pct, day5_pct, day6_pct, day7_pct)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+'''
+
+# How long downloaded data is reused before Yahoo Finance is queried again
+YF_CACHE_EXPIRE_SECONDS = 3600
+
+def cache_ttl_bucket() -> int:
+    """Get the current cache period; memoized results expire when it rolls over"""
+    return int(time.time() // YF_CACHE_EXPIRE_SECONDS)
+
+class _EmptyHistory(Exception):
+    """Raised inside the history cache so failed (empty) fetches are not memoized"""
+
+@lru_cache(maxsize=256)
+def _get_cached_history(symbol: str, start_date: str, end_date: str, ttl_bucket: int) -> pd.DataFrame:
+    """Fetch Ticker.history, memoized per (symbol, start, end) until ttl_bucket rolls over"""
+    df = yf.Ticker(symbol).history(start=start_date, end=end_date)
+    if df.empty:
+        raise _EmptyHistory(df)
+    return df
+
+def get_history(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Get daily stock data, reusing frames fetched within the last YF_CACHE_EXPIRE_SECONDS
+    
+    Args:
+        symbol: Stock symbol (e.g., 'AAPL')
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+    
+    Returns:
+        Copy of the cached DataFrame, safe for the caller to modify (empty
+        results are returned but never cached, so the next call retries)
+    """
+    try:
+        return _get_cached_history(symbol, start_date, end_date, cache_ttl_bucket()).copy()
+    except _EmptyHistory as e:
+        return e.args[0]
 
 def download_stock_data(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
     """
@@ -17,59 +98,316 @@ def download_stock_data(symbol: str, start_date: str, end_date: str) -> pd.DataF
         DataFrame with stock data
     """
     try:
-        stock = yf.Ticker(symbol)
-        df = stock.history(start=start_date, end=end_date)
+        df = get_history(symbol, start_date, end_date)
         return df
     except Exception as e:
         print(f"Error downloading data: {e}")
         return None
 
-def calculate_profit(symbol: str, purchase_date: str) -> dict:
+def download_stock_data_bulk(symbols: list[str], start_date: str, end_date: str) -> dict[str, pd.DataFrame]:
+    """
+    Download stock data for many symbols from Yahoo Finance
+    
+    Symbols are requested in chunks of BULK_CHUNK_SIZE per HTTP request,
+    with yfinance fetching each chunk concurrently.
+    
+    Args:
+        symbols: Stock symbols (e.g., ['AAPL', 'MSFT'])
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+    
+    Returns:
+        Dictionary mapping each symbol to its DataFrame (missing symbols are omitted)
+    """
+    data = {}
+    for i in range(0, len(symbols), BULK_CHUNK_SIZE):
+        chunk = symbols[i:i + BULK_CHUNK_SIZE]
+        try:
+            df = yf.download(tickers=" ".join(chunk),
+                             start=start_date,
+                             end=end_date,
+                             group_by='ticker',
+                             auto_adjust=True,
+                             threads=True,
+                             progress=False)
+        except Exception as e:
+            print(f"Error downloading data: {e}")
+            continue
+        
+        # Split the (ticker, field) column MultiIndex into one frame per symbol
+        for symbol in chunk:
+            if isinstance(df.columns, pd.MultiIndex):
+                if symbol not in df.columns.get_level_values(0):
+                    continue
+                symbol_df = df[symbol]
+            else:
+                symbol_df = df
+            symbol_df = symbol_df.dropna(how='all')
+            if not symbol_df.empty:
+                data[symbol] = symbol_df
+    
+    return data
+
+def _parse_chart_response(payload: dict) -> pd.DataFrame:
+    """
+    Convert a Yahoo Finance chart JSON payload into an OHLCV DataFrame
+    
+    Prices are adjusted for splits and dividends like Ticker.history's default.
+    """
+    result = payload['chart']['result'][0]
+    if not result.get('timestamp'):
+        return pd.DataFrame()
+    
+    quote = result['indicators']['quote'][0]
+    df = pd.DataFrame({
+        'Open': quote['open'],
+        'High': quote['high'],
+        'Low': quote['low'],
+        'Close': quote['close'],
+        'Volume': quote['volume']
+    }, dtype='float64')
+    
+    adjclose = result['indicators'].get('adjclose')
+    if adjclose:
+        ratio = np.asarray(adjclose[0]['adjclose'], dtype='float64') / df['Close'].to_numpy()
+        df[['Open', 'High', 'Low', 'Close']] = df[['Open', 'High', 'Low', 'Close']].mul(ratio, axis=0)
+    
+    tz = result['meta'].get('exchangeTimezoneName', 'UTC')
+    df.index = pd.to_datetime(result['timestamp'], unit='s', utc=True).tz_convert(tz).normalize()
+    df.index.name = 'Date'
+    return df.dropna(how='all')
+
+async def _download_one_async(client: 'httpx.AsyncClient', semaphore: asyncio.Semaphore,
+                              symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Download daily data for one symbol from the Yahoo Finance chart endpoint
+    """
+    params = {
+        'period1': int(datetime.fromisoformat(start_date).replace(tzinfo=timezone.utc).timestamp()),
+        'period2': int(datetime.fromisoformat(end_date).replace(tzinfo=timezone.utc).timestamp()),
+        'interval': '1d',
+        'events': 'div,splits'
+    }
+    async with semaphore:
+        response = await client.get(YAHOO_CHART_URL.format(symbol=symbol), params=params)
+    response.raise_for_status()
+    return _parse_chart_response(response.json())
+
+async def _download_one_threaded(semaphore: asyncio.Semaphore, symbol: str,
+                                 start_date: str, end_date: str) -> pd.DataFrame:
+    """
+    Download daily data for one symbol with get_history in a worker thread
+    """
+    async with semaphore:
+        return await asyncio.to_thread(get_history, symbol, start_date, end_date)
+
+async def download_bulk_async(symbols: list[str], start_date: str, end_date: str) -> dict[str, pd.DataFrame]:
+    """
+    Download stock data for many symbols concurrently
+    
+    Issues up to MAX_CONCURRENT_DOWNLOADS chart requests at a time so the
+    per-request latency overlaps. When httpx is not installed, get_history
+    runs for each symbol in worker threads instead. Both paths index rows by
+    exchange-local, timezone-aware midnights like Ticker.history.
+    
+    Args:
+        symbols: Stock symbols (e.g., ['AAPL', 'MSFT'])
+        start_date: Start date in 'YYYY-MM-DD' format
+        end_date: End date in 'YYYY-MM-DD' format
+    
+    Returns:
+        Dictionary mapping each symbol to its DataFrame (missing symbols are omitted)
+    """
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_DOWNLOADS)
+    if httpx is None:
+        frames = await asyncio.gather(
+            *(_download_one_threaded(semaphore, symbol, start_date, end_date) for symbol in symbols),
+            return_exceptions=True
+        )
+    else:
+        headers = {'User-Agent': 'Mozilla/5.0'}
+        async with httpx.AsyncClient(headers=headers, timeout=30) as client:
+            frames = await asyncio.gather(
+                *(_download_one_async(client, semaphore, symbol, start_date, end_date) for symbol in symbols),
+                return_exceptions=True
+            )
+    
+    data = {}
+    for symbol, df in zip(symbols, frames):
+        if isinstance(df, Exception):
+            print(f"Error downloading data for {symbol}: {df}")
+        elif not df.empty:
+            data[symbol] = df
+    return data
+
+def calculate_profit(symbol: str, purchase_date: str, df: pd.DataFrame = None) -> dict:
     """
     Calculate daily profits for 7 days after purchase date
     
     Args:
         symbol: Stock symbol (e.g., 'AAPL')
         purchase_date: Purchase date in 'YYYY-MM-DD' format
+        df: Optional pre-fetched stock data starting at the purchase date
+            (e.g., from download_stock_data_bulk); downloaded if omitted
     
     Returns:
         Dictionary containing daily profits
     """
     # Convert purchase_date to datetime
-    purchase_date = datetime.strptime(purchase_date, '%Y-%m-%d')
+    purchase_date = datetime.fromisoformat(purchase_date)
     
-    # Calculate end date (purchase date + 8 days to include the 7th day)
-    end_date = purchase_date + timedelta(days=8)
+    # Calculate end date far enough out to include the 7th trading day
+    end_date = purchase_date + timedelta(days=HOLD_WINDOW_DAYS)
     
-    # Download data
-    df = download_stock_data(symbol, 
-                           purchase_date.strftime('%Y-%m-%d'),
-                           end_date.strftime('%Y-%m-%d'))
+    # Download data unless the caller already fetched it
+    if df is None:
+        df = download_stock_data(symbol, 
+                               purchase_date.date().isoformat(),
+                               end_date.date().isoformat())
     
     if df is None or df.empty:
         return {"error": "No data available"}
     
-    # Get purchase price (Close price on purchase date)
-    purchase_price = df.iloc[0]['Close']
-    
-    # Calculate daily profits
-    profits = {}
-    for i in range(1, min(8, len(df))):
-        current_price = df.iloc[i]['Close']
-        profit_percentage = ((current_price - purchase_price) / purchase_price) * 100
-        day_date = (purchase_date + timedelta(days=i)).strftime('%Y-%m-%d')
-        profits[day_date] = {
-            'profit_percentage': round(profit_percentage, 2),
-            'price': round(current_price, 2)
-        }
+    # Purchase price is the first close; the next (up to) 7 closes are the holding days
+    closes = df['Close'].to_numpy()[:HOLD_DAYS + 1]
+    pct = (closes[1:] / closes[0] - 1.0) * 100.0
+    
+    # Use the actual trading dates rather than calendar offsets from the purchase date
+    dates = df.index[1:HOLD_DAYS + 1].strftime('%Y-%m-%d')
+    
+    profits = dict(zip(dates, [
+        {'profit_percentage': round(float(p), 2), 'price': round(float(c), 2)}
+        for p, c in zip(pct, closes[1:])
+    ]))
     
     return profits
 
+def _profits_numpy(closes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """
+    Compute the HOLD_DAYS percent-change matrix for many purchases at once
+    
+    Args:
+        closes: Close prices, one row per purchase, NaN-padded on the right
+        starts: Column index of the purchase day in each row
+    
+    Returns:
+        Array of shape (len(starts), HOLD_DAYS), NaN where no data exists
+    """
+    rows = np.arange(len(starts))
+    offsets = starts[:, None] + np.arange(1, HOLD_DAYS + 1)
+    valid = offsets < closes.shape[1]
+    held = closes[rows[:, None], np.minimum(offsets, closes.shape[1] - 1)]
+    base = closes[rows, starts][:, None]
+    return np.where(valid, (held / base - 1.0) * 100.0, np.nan)
+
+def _profits_loop(closes: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Numba kernel equivalent of _profits_numpy, parallel over purchases"""
+    n = starts.shape[0]
+    out = np.full((n, HOLD_DAYS), np.nan)
+    for i in prange(n):
+        s = starts[i]
+        base = closes[i, s]
+        for d in range(HOLD_DAYS):
+            j = s + 1 + d
+            if j < closes.shape[1]:
+                out[i, d] = (closes[i, j] / base - 1.0) * 100.0
+    return out
+
+# Use the jitted kernel when numba is installed, otherwise the NumPy version
+_profits = njit(cache=True, parallel=True)(_profits_loop) if njit is not None else _profits_numpy
+
+def calculate_profits_bulk(purchases: list[tuple[str, str]]) -> dict[tuple[str, str], dict]:
+    """
+    Calculate daily profits for many (symbol, purchase_date) pairs
+    
+    Downloads every symbol in one batch and computes all profits in a
+    single kernel call instead of calling calculate_profit per pair. Each
+    pair only sees the same HOLD_WINDOW_DAYS window calculate_profit would
+    download, so results do not depend on the rest of the batch.
+    
+    Args:
+        purchases: List of (symbol, purchase_date) pairs, dates in 'YYYY-MM-DD' format
+    
+    Returns:
+        Dictionary mapping each pair to the same structure calculate_profit returns
+    """
+    if not purchases:
+        return {}
+    
+    first_date = min(date for _, date in purchases)
+    last_date = datetime.fromisoformat(max(date for _, date in purchases))
+    end_date = (last_date + timedelta(days=HOLD_WINDOW_DAYS)).date().isoformat()
+    
+    data = download_stock_data_bulk(sorted({symbol for symbol, _ in purchases}), first_date, end_date)
+    
+    # Stack the close series of each purchase into one NaN-padded matrix
+    results = {}
+    valid = []
+    for symbol, purchase_date in purchases:
+        df = data.get(symbol)
+        if df is None:
+            results[(symbol, purchase_date)] = {"error": "No data available"}
+            continue
+        dates = df.index.strftime('%Y-%m-%d').to_numpy()
+        window_end = (datetime.fromisoformat(purchase_date) + timedelta(days=HOLD_WINDOW_DAYS)).date().isoformat()
+        start = int(np.searchsorted(dates, purchase_date))
+        stop = int(np.searchsorted(dates, window_end))
+        if start >= stop:
+            results[(symbol, purchase_date)] = {"error": "No data available"}
+            continue
+        valid.append((symbol, purchase_date, start, dates, df['Close'].to_numpy()[:stop]))
+    
+    if not valid:
+        return results
+    
+    width = max(len(closes) for *_, closes in valid)
+    close_mat = np.full((len(valid), width), np.nan)
+    for i, (*_, closes) in enumerate(valid):
+        close_mat[i, :len(closes)] = closes
+    starts = np.array([start for _, _, start, _, _ in valid], dtype=np.int64)
+    
+    pct = _profits(close_mat, starts)
+    
+    for i, (symbol, purchase_date, start, dates, closes) in enumerate(valid):
+        count = min(HOLD_DAYS, len(closes) - start - 1)
+        results[(symbol, purchase_date)] = {
+            dates[start + d + 1]: {
+                'profit_percentage': round(float(pct[i, d]), 2),
+                'price': round(float(closes[start + d + 1]), 2)
+            }
+            for d in range(count)
+        }
+    
+    return results
+
+def open_db(check_same_thread: bool = True) -> sqlite3.Connection:
+    """
+    Open the analysis database with performance PRAGMAs applied
+    
+    WAL journaling with synchronous=NORMAL avoids an fsync per commit, at the
+    cost that a crash may lose the last committed transaction. That is
+    acceptable for analysis results, which can always be recomputed.
+    
+    Args:
+        check_same_thread: Pass False for a connection shared across threads
+    
+    Returns:
+        Open SQLite connection
+    """
+    conn = sqlite3.connect(DB_PATH, check_same_thread=check_same_thread)
+    conn.executescript('''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-20000;
+    ''')
+    return conn
+
 def create_database():
     """
     Create SQLite database and required tables if they don't exist
     """
-    conn = sqlite3.connect('stock_analysis.db')
+    conn = open_db()
     cursor = conn.cursor()
     
     # Create table for stock analysis results
@@ -86,41 +424,108 @@ def create_database():
     )
     ''')
     
+    # Index the columns used to list analysed entries
+    cursor.execute('''
+    CREATE INDEX IF NOT EXISTS idx_stock_symbol_date
+    ON stock_analysis(symbol, purchase_date)
+    ''')
+    
+    # One row per analysis with the daily profits as columns, for portfolio-level scans
+    cursor.execute('''
+    CREATE TABLE IF NOT EXISTS profits_wide (
+        symbol TEXT NOT NULL,
+        purchase_date DATE NOT NULL,
+        purchase_price REAL NOT NULL,
+        day1_pct REAL,
+        day2_pct REAL,
+        day3_pct REAL,
+        day4_pct REAL,
+        day5_pct REAL,
+        day6_pct REAL,
+        day7_pct REAL,
+        PRIMARY KEY (symbol, purchase_date)
+    )
+    ''')
+    
     conn.commit()
     conn.close()
 
-def save_results_to_db(symbol: str, purchase_date: str, purchase_price: float, results: dict):
+def build_result_rows(symbol: str, purchase_date: str, purchase_price: float, results: dict) -> tuple:
+    """
+    Convert calculate_profit results into rows for stock_analysis and profits_wide
+    
+    Returns:
+        Tuple of (list of stock_analysis rows, profits_wide row)
+    """
+    rows = [
+        (symbol, purchase_date, purchase_price, date, data['price'], data['profit_percentage'])
+        for date, data in results.items()
+    ]
+    
+    # Daily profits in date order, padded to HOLD_DAYS when fewer trading days were available
+    profits = [results[date]['profit_percentage'] for date in sorted(results)][:HOLD_DAYS]
+    wide_row = (symbol, purchase_date, purchase_price, *profits, *[None] * (HOLD_DAYS - len(profits)))
+    
+    return rows, wide_row
+
+class ResultsWriter:
+    """
+    Write analysis results over one long-lived connection
+    
+    Keeping the connection and cursor open lets sqlite3's statement cache
+    reuse the prepared INSERT statements across batches, so callers saving
+    many analyses should create one writer and pass it to save_results_to_db.
+    """
+    
+    def __init__(self, check_same_thread: bool = True):
+        self.conn = open_db(check_same_thread=check_same_thread)
+        self.cursor = self.conn.cursor()
+    
+    def write_batch(self, rows: list, wide_rows: list = None):
+        """
+        Insert stock_analysis rows and profits_wide rows in one transaction
+        
+        Args:
+            rows: stock_analysis rows as built by build_result_rows
+            wide_rows: profits_wide rows as built by build_result_rows
+        """
+        try:
+            self.conn.execute('BEGIN')
+            self.cursor.executemany(INSERT_RESULT_SQL, rows)
+            self.cursor.executemany(INSERT_WIDE_SQL, wide_rows or [])
+            self.conn.commit()
+        except sqlite3.Error:
+            self.conn.rollback()
+            raise
+    
+    def close(self):
+        """Close the underlying connection"""
+        self.conn.close()
+
+def save_results_to_db(symbol: str, purchase_date: str, purchase_price: float, results: dict,
+                       writer: ResultsWriter = None):
     """
     Save analysis results to SQLite database
+    
+    Args:
+        writer: Optional open ResultsWriter to reuse across calls; when omitted a
+                writer is opened and closed for this call only
     """
-    conn = sqlite3.connect('stock_analysis.db')
-    cursor = conn.cursor()
+    rows, wide_row = build_result_rows(symbol, purchase_date, purchase_price, results)
+    own_writer = writer is None
+    if own_writer:
+        writer = ResultsWriter()
     
     try:
-        # Insert each day's result
-        for date, data in results.items():
-            cursor.execute('''
-            INSERT INTO stock_analysis 
-            (symbol, purchase_date, purchase_price, analysis_date, closing_price, profit_percentage)
-            VALUES (?, ?, ?, ?, ?, ?)
-            ''', (
-                symbol,
-                purchase_date,
-                purchase_price,
-                date,
-                data['price'],
-                data['profit_percentage']
-            ))
-        
-        conn.commit()
+        writer.write_batch(rows, [wide_row])
         print("\nResults saved to database successfully!")
         
     except sqlite3.Error as e:
         print(f"Error saving to database: {e}")
-        conn.rollback()
     
     finally:
-        conn.close()
+        if own_writer:
+            writer.close()
 
 def main():
     """
@@ -143,20 +548,17 @@ def main():
         purchase_price = results[first_date]['price'] / (1 + results[first_date]['profit_percentage']/100)
         
         # Prepare table data
-        table_data = []
-        headers = ["Date", "Price ($)", "Profit (%)"]
-        
-        for date, data in results.items():
-            table_data.append([
-                date,
-                f"{data['price']:.2f}",
-                f"{data['profit_percentage']:+.2f}"
-            ])
+        table = pd.DataFrame.from_dict(results, orient='index')[['price', 'profit_percentage']]
+        table.columns = ["Price ($)", "Profit (%)"]
+        table.index.name = "Date"
         
         # Print results in table format
         print(f"\nProfit analysis for {symbol} from {purchase_date}")
         print(f"Purchase price: ${purchase_price:.2f}")
-        print(tabulate(table_data, headers=headers, tablefmt="grid"))
+        print(table.to_string(formatters={
+            "Price ($)": '{:.2f}'.format,
+            "Profit (%)": '{:+.2f}'.format
+        }))
         
         # Save results to database
         save_results_to_db(symbol, purchase_date, purchase_price, results)
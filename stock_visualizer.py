@@ -1,7 +1,18 @@
-import yfinance as yf
+import numpy as np
 import plotly.graph_objects as go
 from datetime import datetime, timedelta
-import sqlite3
+from stock_analysis import get_history, open_db
+
+try:
+    from plotly_resampler import FigureResampler
+except ImportError:
+    FigureResampler = None
+
+# Charts with more rows than this are resampled when plotly-resampler is installed
+MAX_SHOWN_SAMPLES = 2000
+
+# Local port the resampled chart is served on
+DASH_PORT = 8050
 
 def get_stock_data(symbol: str, start_date: str, days: int = 30) -> tuple:
     """
@@ -16,7 +27,7 @@ def get_stock_data(symbol: str, start_date: str, days: int = 30) -> tuple:
         Tuple of (DataFrame with stock data, purchase_price)
     """
     # Convert start_date to datetime
-    start_date = datetime.strptime(start_date, '%Y-%m-%d')
+    start_date = datetime.fromisoformat(start_date)
     
     # Get data from 15 days before purchase to 15 days after
     before_days = days // 2
@@ -26,53 +37,75 @@ def get_stock_data(symbol: str, start_date: str, days: int = 30) -> tuple:
     end = start_date + timedelta(days=after_days)
     
     # Download data
-    stock = yf.Ticker(symbol)
-    df = stock.history(start=start.strftime('%Y-%m-%d'),
-                      end=end.strftime('%Y-%m-%d'))
+    df = get_history(symbol, start.date().isoformat(), end.date().isoformat())
     
     # Get purchase price
-    purchase_price = df.loc[start_date.strftime('%Y-%m-%d')]['Close']
+    purchase_price = df.loc[start_date.date().isoformat()]['Close']
     
     return df, purchase_price
 
-def create_candlestick_chart(symbol: str, purchase_date: str):
+def create_candlestick_chart(symbol: str, purchase_date: str, days: int = 30):
     """
     Create an interactive candlestick chart with volume bars and purchase point marked
     
+    Ranges longer than MAX_SHOWN_SAMPLES rows are drawn with plotly-resampler
+    when it is installed. Candlesticks cannot be resampled, so the price is then
+    shown as a close line and the chart is served through Dash until Ctrl+C.
+    
     Args:
         symbol: Stock symbol (e.g., 'AAPL')
         purchase_date: Purchase date in 'YYYY-MM-DD' format
+        days: Number of days to show (default 30 days)
     """
     # Get data
-    df, purchase_price = get_stock_data(symbol, purchase_date)
+    df, purchase_price = get_stock_data(symbol, purchase_date, days)
+    resample = FigureResampler is not None and len(df) > MAX_SHOWN_SAMPLES
     
     # Create figure with secondary y-axis
-    fig = go.Figure()
-    
-    # Add candlestick chart
-    fig.add_trace(
-        go.Candlestick(
-            x=df.index,
-            open=df['Open'],
-            high=df['High'],
-            low=df['Low'],
-            close=df['Close'],
-            name='Candlesticks',
-            yaxis='y'
+    if resample:
+        fig = FigureResampler(go.Figure(), default_n_shown_samples=MAX_SHOWN_SAMPLES)
+    else:
+        fig = go.Figure()
+    
+    # Add candlestick chart, or a resampled close line for long ranges
+    if resample:
+        fig.add_trace(
+            go.Scattergl(name='Close', mode='lines', yaxis='y'),
+            hf_x=df.index,
+            hf_y=df['Close']
+        )
+    else:
+        fig.add_trace(
+            go.Candlestick(
+                x=df.index,
+                open=df['Open'],
+                high=df['High'],
+                low=df['Low'],
+                close=df['Close'],
+                name='Candlesticks',
+                yaxis='y'
+            )
         )
-    )
     
     # Add volume bars
-    colors = ['red' if row['Open'] > row['Close'] else 'green' for _, row in df.iterrows()]
-    fig.add_trace(
-        go.Bar(
-            x=df.index,
-            y=df['Volume'],
-            name='Volume',
-            marker_color=colors,
-            yaxis='y2'
+    colors = np.where(df['Open'].to_numpy() > df['Close'].to_numpy(), 'red', 'green').tolist()
+    if resample:
+        fig.add_trace(
+            go.Bar(name='Volume', yaxis='y2'),
+            hf_x=df.index,
+            hf_y=df['Volume'],
+            hf_marker_color=colors
+        )
+    else:
+        fig.add_trace(
+            go.Bar(
+                x=df.index,
+                y=df['Volume'],
+                name='Volume',
+                marker_color=colors,
+                yaxis='y2'
+            )
         )
-    )
     
     # Add purchase point marker
     fig.add_trace(
@@ -110,14 +143,34 @@ def create_candlestick_chart(symbol: str, purchase_date: str):
         xaxis_rangeslider_visible=False  # Disable rangeslider to save space
     )
     
-    # Show the plot
-    fig.show()
+    # Show the plot (FigureResampler serves it through Dash so zooming reloads points)
+    if resample:
+        print(f"Serving resampled chart at http://127.0.0.1:{DASH_PORT}/ (press Ctrl+C to stop)")
+        fig.show_dash(mode='external', port=DASH_PORT)
+    else:
+        fig.show()
+
+def read_days(default: int = 30) -> int:
+    """
+    Ask how many days of data to show
+    
+    Ranges above roughly 2900 days exceed MAX_SHOWN_SAMPLES trading rows and
+    are served through plotly-resampler when it is installed.
+    """
+    value = input(f"Enter number of days to show (default {default}): ").strip()
+    if not value:
+        return default
+    try:
+        return max(int(value), 1)
+    except ValueError:
+        print(f"Invalid number, showing {default} days.")
+        return default
 
 def visualize_from_db():
     """
     Visualize stock data from database entries
     """
-    conn = sqlite3.connect('stock_analysis.db')
+    conn = open_db()
     cursor = conn.cursor()
     
     # Get unique symbol-purchase_date combinations
@@ -145,7 +198,7 @@ def visualize_from_db():
             return
         if 1 <= choice <= len(entries):
             symbol, date = entries[choice - 1]
-            create_candlestick_chart(symbol, date)
+            create_candlestick_chart(symbol, date, read_days())
         else:
             print("Invalid selection.")
     except ValueError:
@@ -165,7 +218,7 @@ def main():
     if choice == "1":
         symbol = input("Enter stock symbol (e.g., AAPL): ")
         purchase_date = input("Enter purchase date (YYYY-MM-DD): ")
-        create_candlestick_chart(symbol, purchase_date)
+        create_candlestick_chart(symbol, purchase_date, read_days())
     elif choice == "2":
         visualize_from_db()
     elif choice == "0":
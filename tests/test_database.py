@@ -0,0 +1,82 @@
+import sqlite3
+
+import pytest
+
+pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+pytest.importorskip("yfinance")
+
+import stock_analysis
+
+
+RESULTS = {
+    '2024-01-03': {'price': 101.0, 'profit_percentage': 1.0},
+    '2024-01-04': {'price': 102.0, 'profit_percentage': 2.0},
+    '2024-01-05': {'price': 103.0, 'profit_percentage': 3.0},
+    '2024-01-08': {'price': 104.0, 'profit_percentage': 4.0},
+    '2024-01-09': {'price': 105.0, 'profit_percentage': 5.0},
+    '2024-01-10': {'price': 106.0, 'profit_percentage': 6.0},
+    '2024-01-11': {'price': 107.0, 'profit_percentage': 7.0}
+}
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    monkeypatch.setattr(stock_analysis, 'DB_PATH', str(tmp_path / 'stock_analysis.db'))
+    stock_analysis.create_database()
+    conn = sqlite3.connect(stock_analysis.DB_PATH)
+    yield conn
+    conn.close()
+
+
+def test_shared_writer_saves_several_analyses(db):
+    writer = stock_analysis.ResultsWriter()
+    try:
+        stock_analysis.save_results_to_db('AAPL', '2024-01-02', 100.0, RESULTS, writer)
+        stock_analysis.save_results_to_db('MSFT', '2024-01-02', 100.0, RESULTS, writer)
+        
+        # The writer is left open for further batches
+        writer.conn.execute('SELECT 1')
+    finally:
+        writer.close()
+    
+    assert db.execute('SELECT COUNT(*) FROM stock_analysis').fetchone() == (14,)
+    assert db.execute('SELECT COUNT(*) FROM profits_wide').fetchone() == (2,)
+
+
+def test_create_database_creates_tables(db):
+    tables = {name for (name,) in db.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'index')")}
+    
+    assert {'stock_analysis', 'profits_wide', 'idx_stock_symbol_date'} <= tables
+    
+    # Running it again is a no-op
+    stock_analysis.create_database()
+
+
+def test_saving_twice_appends_daily_rows_and_replaces_wide_row(db):
+    stock_analysis.save_results_to_db('AAPL', '2024-01-02', 100.0, RESULTS)
+    stock_analysis.save_results_to_db('AAPL', '2024-01-02', 100.0, RESULTS)
+    
+    assert db.execute('SELECT COUNT(*) FROM stock_analysis').fetchone() == (14,)
+    assert db.execute('SELECT * FROM profits_wide').fetchall() == [
+        ('AAPL', '2024-01-02', 100.0, 1.0, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0)
+    ]
+
+
+def test_short_results_pad_wide_row_with_null(db):
+    short = dict(list(RESULTS.items())[:3])
+    
+    stock_analysis.save_results_to_db('AAPL', '2024-01-02', 100.0, short)
+    
+    assert db.execute('SELECT * FROM profits_wide').fetchall() == [
+        ('AAPL', '2024-01-02', 100.0, 1.0, 2.0, 3.0, None, None, None, None)
+    ]
+
+
+def test_failed_insert_rolls_back_both_tables(db, monkeypatch):
+    monkeypatch.setattr(stock_analysis, 'INSERT_WIDE_SQL', 'INSERT INTO missing_table VALUES (?)')
+    
+    stock_analysis.save_results_to_db('AAPL', '2024-01-02', 100.0, RESULTS)
+    
+    assert db.execute('SELECT COUNT(*) FROM stock_analysis').fetchone() == (0,)
+    assert db.execute('SELECT COUNT(*) FROM profits_wide').fetchone() == (0,)
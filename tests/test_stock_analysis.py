@@ -0,0 +1,180 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("yfinance")
+
+import stock_analysis
+
+
+def make_history(symbol: str) -> pd.DataFrame:
+    """Build a deterministic daily frame shaped like Ticker.history output"""
+    index = pd.bdate_range('2024-01-02', periods=60, tz='America/New_York', name='Date')
+    rng = np.random.default_rng(sum(map(ord, symbol)))
+    close = 100 + rng.normal(0, 1, len(index)).cumsum()
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': rng.integers(1_000, 10_000, len(index)).astype('float64')
+    }, index=index)
+
+
+def fake_download(symbol: str, start_date: str, end_date: str) -> pd.DataFrame:
+    df = make_history(symbol)
+    dates = df.index.strftime('%Y-%m-%d')
+    return df[(dates >= start_date) & (dates < end_date)]
+
+
+def fake_download_bulk(symbols: list, start_date: str, end_date: str) -> dict:
+    return {symbol: fake_download(symbol, start_date, end_date) for symbol in symbols}
+
+
+@pytest.fixture
+def offline(monkeypatch):
+    monkeypatch.setattr(stock_analysis, 'download_stock_data', fake_download)
+    monkeypatch.setattr(stock_analysis, 'download_stock_data_bulk', fake_download_bulk)
+
+
+def test_calculate_profit_covers_hold_days(offline):
+    results = stock_analysis.calculate_profit('AAPL', '2024-01-06')
+    
+    assert len(results) == stock_analysis.HOLD_DAYS
+    assert min(results) == '2024-01-09'
+
+
+def test_calculate_profits_bulk_matches_calculate_profit(offline):
+    purchases = [('AAPL', '2024-01-06'), ('MSFT', '2024-01-10'), ('AAPL', '2024-02-01')]
+    
+    bulk = stock_analysis.calculate_profits_bulk(purchases)
+    
+    for symbol, purchase_date in purchases:
+        assert bulk[(symbol, purchase_date)] == stock_analysis.calculate_profit(symbol, purchase_date)
+        assert len(bulk[(symbol, purchase_date)]) == stock_analysis.HOLD_DAYS
+
+
+def test_calculate_profits_bulk_reports_missing_data(offline):
+    bulk = stock_analysis.calculate_profits_bulk([('AAPL', '2030-01-01')])
+    
+    assert bulk[('AAPL', '2030-01-01')] == {"error": "No data available"}
+
+
+def test_profit_kernels_agree():
+    rng = np.random.default_rng(0)
+    closes = rng.uniform(50, 150, (5, 12))
+    closes[1, 6:] = np.nan
+    closes[3, 9:] = np.nan
+    starts = np.array([0, 2, 4, 5, 11], dtype=np.int64)
+    
+    expected = stock_analysis._profits_numpy(closes, starts)
+    
+    np.testing.assert_allclose(stock_analysis._profits_loop(closes, starts), expected, equal_nan=True)
+    np.testing.assert_allclose(stock_analysis._profits(closes, starts), expected, equal_nan=True)
+    assert np.isnan(expected[4]).all()
+
+
+CHART_PAYLOAD = {
+    'chart': {
+        'result': [{
+            'meta': {'exchangeTimezoneName': 'America/New_York'},
+            'timestamp': [1704205800, 1704292200, 1704378600],
+            'indicators': {
+                'quote': [{
+                    'open': [10.0, 12.0, None],
+                    'high': [11.0, 13.0, None],
+                    'low': [9.0, 11.0, None],
+                    'close': [10.0, 12.0, None],
+                    'volume': [100, None, None]
+                }],
+                'adjclose': [{'adjclose': [5.0, 6.0, None]}]
+            }
+        }]
+    }
+}
+
+
+def test_parse_chart_response():
+    df = stock_analysis._parse_chart_response(CHART_PAYLOAD)
+    
+    # The all-None row is dropped and the remaining rows are normalized to local midnight
+    assert list(df.index.strftime('%Y-%m-%d %H:%M')) == ['2024-01-02 00:00', '2024-01-03 00:00']
+    assert str(df.index.tz) == 'America/New_York'
+    assert df.index.name == 'Date'
+    
+    # OHLC are scaled by adjclose / close, volume is left alone
+    assert df['Close'].tolist() == [5.0, 6.0]
+    assert df['Open'].tolist() == [5.0, 6.0]
+    assert df['High'].tolist() == [5.5, 6.5]
+    assert df['Low'].tolist() == [4.5, 5.5]
+    assert df['Volume'].iloc[0] == 100
+    assert np.isnan(df['Volume'].iloc[1])
+
+
+def test_parse_chart_response_without_timestamps():
+    payload = {'chart': {'result': [{'meta': {}, 'indicators': {'quote': [{}]}}]}}
+    
+    assert stock_analysis._parse_chart_response(payload).empty
+
+
+def test_download_one_async_uses_utc_periods():
+    import asyncio
+    
+    class FakeResponse:
+        def raise_for_status(self):
+            pass
+        
+        def json(self):
+            return CHART_PAYLOAD
+    
+    class FakeClient:
+        async def get(self, url, params):
+            self.url = url
+            self.params = params
+            return FakeResponse()
+    
+    client = FakeClient()
+    df = asyncio.run(stock_analysis._download_one_async(
+        client, asyncio.Semaphore(1), 'AAPL', '2024-01-02', '2024-01-05'
+    ))
+    
+    assert client.url.endswith('/AAPL')
+    assert client.params['period1'] == 1704153600
+    assert client.params['period2'] == 1704412800
+    assert len(df) == 2
+
+
+def test_get_history_does_not_cache_empty_frames(monkeypatch):
+    calls = []
+    
+    class FakeTicker:
+        def __init__(self, symbol):
+            self.symbol = symbol
+        
+        def history(self, start, end):
+            calls.append(self.symbol)
+            return pd.DataFrame() if len(calls) == 1 else make_history(self.symbol)
+    
+    monkeypatch.setattr(stock_analysis.yf, 'Ticker', FakeTicker)
+    stock_analysis._get_cached_history.cache_clear()
+    
+    assert stock_analysis.get_history('ZZZZ', '2024-01-02', '2024-01-10').empty
+    assert not stock_analysis.get_history('ZZZZ', '2024-01-02', '2024-01-10').empty
+    assert not stock_analysis.get_history('ZZZZ', '2024-01-02', '2024-01-10').empty
+    assert calls == ['ZZZZ', 'ZZZZ']
+    
+    stock_analysis._get_cached_history.cache_clear()
+
+
+def test_download_bulk_async_fallback_matches_history(monkeypatch):
+    import asyncio
+    
+    monkeypatch.setattr(stock_analysis, 'httpx', None)
+    monkeypatch.setattr(stock_analysis, 'get_history',
+                        lambda symbol, start, end: fake_download(symbol, start, end) if symbol != 'NONE' else pd.DataFrame())
+    
+    data = asyncio.run(stock_analysis.download_bulk_async(['AAPL', 'NONE'], '2024-01-02', '2024-01-10'))
+    
+    assert list(data) == ['AAPL']
+    pd.testing.assert_frame_equal(data['AAPL'], fake_download('AAPL', '2024-01-02', '2024-01-10'))
+    assert str(data['AAPL'].index.tz) == 'America/New_York'
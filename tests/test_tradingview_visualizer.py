@@ -0,0 +1,58 @@
+import os
+from datetime import datetime
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+pytest.importorskip("yfinance")
+pytest.importorskip("fastapi")
+
+
+@pytest.fixture
+def visualizer(monkeypatch):
+    # StaticFiles checks the static directory relative to the working directory
+    monkeypatch.chdir(os.path.join(os.path.dirname(__file__), '..'))
+    import tradingview_visualizer
+    return tradingview_visualizer
+
+
+def make_history(rows: int) -> pd.DataFrame:
+    index = pd.bdate_range('2010-01-04', periods=rows, tz='America/New_York', name='Date')
+    close = 100 + np.sin(np.arange(rows) / 10.0) * 10
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': np.full(rows, 1000.0)
+    }, index=index)
+
+
+def test_build_chart_payload_keeps_short_ranges(visualizer):
+    df = make_history(60)
+    
+    payload = visualizer.build_chart_payload(df, datetime(2010, 2, 1))
+    
+    assert len(payload["candlestick"]) == len(payload["volume"]) == 60
+    assert payload["candlestick"][0]["time"] == int(df.index[0].timestamp())
+    assert payload["candlestick"][0]["close"] == df['Close'].iloc[0]
+
+
+@pytest.mark.parametrize("use_lttb", [True, False])
+def test_build_chart_payload_downsamples_long_ranges(visualizer, monkeypatch, use_lttb):
+    if use_lttb:
+        if visualizer.MinMaxLTTBDownsampler is None:
+            pytest.skip("tsdownsample is not installed")
+    else:
+        monkeypatch.setattr(visualizer, 'MinMaxLTTBDownsampler', None)
+    df = make_history(5000)
+    
+    payload = visualizer.build_chart_payload(df, datetime(2015, 1, 5))
+    
+    times = [point["time"] for point in payload["candlestick"]]
+    assert len(times) == visualizer.MAX_CHART_POINTS
+    assert times == sorted(times)
+    assert times[0] == int(df.index[0].timestamp())
+    assert times[-1] == int(df.index[-1].timestamp())
+    assert [point["time"] for point in payload["volume"]] == times
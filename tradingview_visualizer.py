@@ -1,15 +1,48 @@
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse
-import yfinance as yf
+from fastapi.responses import FileResponse, JSONResponse, ORJSONResponse
+from contextlib import asynccontextmanager
 from datetime import datetime, timedelta
+from functools import lru_cache
+import threading
+import yfinance as yf
+import numpy as np
 import pandas as pd
-import sqlite3
-from pydantic import BaseModel
+from stock_analysis import cache_ttl_bucket, create_database, download_bulk_async, get_history, open_db
+from pydantic import BaseModel, Field
 from typing import List, Dict, Any
 
-app = FastAPI()
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from tsdownsample import MinMaxLTTBDownsampler
+except ImportError:
+    MinMaxLTTBDownsampler = None
+
+# Single shared connection, opened by lifespan and guarded by a lock since
+# sqlite3 connections must not be used from several threads at once
+_conn = None
+_conn_lock = threading.Lock()
+
+# Maximum number of candles sent to the browser before downsampling kicks in
+MAX_CHART_POINTS = 2000
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Open the shared database connection on startup and close it on shutdown"""
+    global _conn
+    create_database()
+    _conn = open_db(check_same_thread=False)
+    yield
+    _conn.close()
+
+# Serialize the large chart payloads with orjson when it is installed
+app = FastAPI(default_response_class=ORJSONResponse if orjson is not None else JSONResponse,
+              lifespan=lifespan)
 
 # Enable CORS
 app.add_middleware(
@@ -23,6 +56,69 @@ app.add_middleware(
 class StockData(BaseModel):
     symbol: str
     purchase_date: str
+    days: int = Field(30, ge=1)
+
+class BulkStockData(BaseModel):
+    entries: List[StockData]
+
+def downsample_indices(ts: np.ndarray, close: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Pick n_out row indices that preserve the visual shape of the close series
+    
+    Uses MinMaxLTTB from tsdownsample when installed, otherwise falls back to
+    evenly spaced rows.
+    """
+    if MinMaxLTTBDownsampler is not None:
+        return MinMaxLTTBDownsampler().downsample(ts, np.ascontiguousarray(close, dtype=np.float64), n_out=n_out)
+    return np.unique(np.linspace(0, len(close) - 1, n_out).round().astype(np.int64))
+
+def _chart_range(start_date: datetime, days: int) -> tuple:
+    """Get the (start, end) dates of the chart window around a purchase date"""
+    # Get data from 15 days before purchase to 15 days after
+    before_days = days * 2
+    after_days = days + 30
+    
+    return start_date - timedelta(days=before_days), start_date + timedelta(days=after_days)
+
+def build_chart_payload(df: pd.DataFrame, start_date: datetime) -> Dict[str, List]:
+    """
+    Convert downloaded stock data into candlestick and volume series for the chart
+    """
+    # Extract columns once instead of building a Series per row
+    arr = df[['Open', 'High', 'Low', 'Close', 'Volume']].to_numpy()
+    ts = df.index.values.astype('datetime64[s]').astype('int64')
+    
+    # Keep the payload bounded for wide date ranges
+    if len(arr) > MAX_CHART_POINTS:
+        idx = downsample_indices(ts, arr[:, 3], MAX_CHART_POINTS)
+        arr = arr[idx]
+        ts = ts[idx]
+    up = (arr[:, 3] >= arr[:, 0]).tolist()
+    
+    # Convert to Python ints/floats in one pass per column, shared by both series
+    times = ts.tolist()
+    o, h, l, c, v = arr.T.tolist()
+    
+    # Prepare data for chart
+    candlestick_data = [
+        {"time": t, "open": a, "high": b, "low": x, "close": y}
+        for t, a, b, x, y in zip(times, o, h, l, c)
+    ]
+    
+    volume_data = [
+        {
+            "time": t,
+            "value": vv,
+            "color": "rgba(38, 166, 154, 0.5)" if u else "rgba(239, 83, 80, 0.5)"
+        }
+        for t, vv, u in zip(times, v, up)
+    ]
+    
+    return {
+        "candlestick": candlestick_data,
+        "volume": volume_data,
+        "purchase_timestamp": int(start_date.timestamp())
+    }
 
 def get_stock_data(symbol: str, start_date: str, days: int = 30) -> Dict[str, List]:
     """
@@ -30,60 +126,58 @@ def get_stock_data(symbol: str, start_date: str, days: int = 30) -> Dict[str, Li
     """
     try:
         # Convert start_date to datetime
-        start_date = datetime.strptime(start_date, '%Y-%m-%d')
-        
-        # Get data from 15 days before purchase to 15 days after
-        before_days = days * 2
-        after_days = days + 30
-        
-        start = start_date - timedelta(days=before_days)
-        end = start_date + timedelta(days=after_days)
+        start_date = datetime.fromisoformat(start_date)
+        start, end = _chart_range(start_date, days)
         
         # Download data
-        stock = yf.Ticker(symbol)
-        df = stock.history(start=start.strftime('%Y-%m-%d'),
-                         end=end.strftime('%Y-%m-%d'))
+        df = get_history(symbol, start.date().isoformat(), end.date().isoformat())
         
-        # Reset index to make date accessible
-        df = df.reset_index()
-        
-        # Prepare data for chart
-        candlestick_data = []
-        volume_data = []
+        return build_chart_payload(df, start_date)
+    
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+async def get_stock_data_bulk(entries: List[StockData]) -> List[Dict[str, List]]:
+    """
+    Get chart data for several entries, downloading all symbols concurrently
+    """
+    if not entries:
+        return []
+    
+    try:
+        purchase_dates = [datetime.fromisoformat(entry.purchase_date) for entry in entries]
+        ranges = [_chart_range(date, entry.days) for date, entry in zip(purchase_dates, entries)]
         
-        for _, row in df.iterrows():
-            timestamp = int(row['Date'].timestamp())
-            
-            candlestick_data.append({
-                "time": timestamp,
-                "open": float(row['Open']),
-                "high": float(row['High']),
-                "low": float(row['Low']),
-                "close": float(row['Close'])
-            })
-            
-            volume_data.append({
-                "time": timestamp,
-                "value": float(row['Volume']),
-                "color": "rgba(38, 166, 154, 0.5)" if row['Close'] >= row['Open'] else "rgba(239, 83, 80, 0.5)"
-            })
+        # One concurrent download covering every entry's window
+        data = await download_bulk_async(sorted({entry.symbol for entry in entries}),
+                                         min(start for start, _ in ranges).date().isoformat(),
+                                         max(end for _, end in ranges).date().isoformat())
         
-        return {
-            "candlestick": candlestick_data,
-            "volume": volume_data,
-            "purchase_timestamp": int(start_date.timestamp())
-        }
+        charts = []
+        for entry, purchase_date, (start, end) in zip(entries, purchase_dates, ranges):
+            df = data.get(entry.symbol)
+            if df is None:
+                charts.append({"error": f"No data available for {entry.symbol}"})
+                continue
+            dates = df.index.strftime('%Y-%m-%d')
+            window = df[(dates >= start.date().isoformat()) & (dates < end.date().isoformat())]
+            charts.append(build_chart_payload(window, purchase_date))
+        return charts
     
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
 
+@lru_cache(maxsize=256)
+def _get_cached_info(symbol: str, ttl_bucket: int) -> Dict[str, Any]:
+    """Fetch stock.info, memoized per symbol until ttl_bucket rolls over"""
+    return yf.Ticker(symbol).info
+
 def get_stock_info(symbol: str) -> Dict[str, Any]:
     """
     Get basic stock information
     """
     try:
-        stock = yf.Ticker(symbol)
-        info = stock.info
+        info = _get_cached_info(symbol, cache_ttl_bucket())
         
         return {
             "name": info.get("longName", "N/A"),
@@ -102,18 +196,15 @@ def get_stock_info(symbol: str) -> Dict[str, Any]:
 def get_db_entries() -> List[Dict[str, str]]:
     """Get entries from database"""
     try:
-        conn = sqlite3.connect('stock_analysis.db')
-        cursor = conn.cursor()
+        with _conn_lock:
+            cursor = _conn.execute('''
+            SELECT DISTINCT symbol, purchase_date
+            FROM stock_analysis
+            ORDER BY created_at DESC
+            ''')
+            rows = cursor.fetchall()
         
-        cursor.execute('''
-        SELECT DISTINCT symbol, purchase_date
-        FROM stock_analysis
-        ORDER BY created_at DESC
-        ''')
-        
-        entries = [{"symbol": symbol, "date": date} for symbol, date in cursor.fetchall()]
-        conn.close()
-        return entries
+        return [{"symbol": symbol, "date": date} for symbol, date in rows]
     
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -121,8 +212,7 @@ def get_db_entries() -> List[Dict[str, str]]:
 # API Routes
 @app.get("/")
 async def root():
-    with open("static/index.html") as f:
-        return HTMLResponse(content=f.read())
+    return FileResponse("static/index.html", media_type="text/html")
 
 @app.get("/api/entries")
 async def get_entries():
@@ -130,7 +220,11 @@ async def get_entries():
 
 @app.post("/api/chart-data")
 async def get_chart_data(stock_data: StockData):
-    return get_stock_data(stock_data.symbol, stock_data.purchase_date)
+    return get_stock_data(stock_data.symbol, stock_data.purchase_date, stock_data.days)
+
+@app.post("/api/chart-data/bulk")
+async def get_bulk_chart_data(bulk_data: BulkStockData):
+    return await get_stock_data_bulk(bulk_data.entries)
 
 @app.get("/api/stock-info/{symbol}")
 async def get_info(symbol: str):